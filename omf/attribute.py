@@ -1,6 +1,11 @@
 """attribute.py: different ProjectElementAttribute classes"""
+import datetime
+import functools
 import json
-import uuid
+import operator
+import os
+import pickle
+import re
 
 import numpy as np
 import properties
@@ -22,6 +27,44 @@ DATA_TYPE_LOOKUP_TO_NUMPY = {
     "BooleanArray": np.dtype("bool"),
 }
 DATA_TYPE_LOOKUP_TO_STRING = {value: key for key, value in DATA_TYPE_LOOKUP_TO_NUMPY.items()}
+_DTYPE_STR_TO_NAME = {value.str: key for key, value in DATA_TYPE_LOOKUP_TO_NUMPY.items()}
+_BOOL_DTYPE = np.dtype(bool)
+
+
+class _ArrayViewProperty(properties.Array):
+    """Array property that does not copy values which are already numpy arrays
+
+    This is only used internally to validate arrays that are already owned
+    by an Array instance or are views on binary data. User input is copied
+    by the public array property.
+    """
+
+    @property
+    def wrapper(self):
+        return np.asarray
+
+
+def _rebuild_array(dtype, shape, buffer):
+    """Rebuild a pickled Array around its unpickled buffer"""
+    return Array._from_view(np.frombuffer(buffer, dtype=dtype).reshape(shape))  # pylint: disable=W0212
+
+
+class _FloatArrayProperty(properties.Array):
+    """Array property that accepts integer or float values and stores them as floats"""
+
+    def __init__(self, doc, **kwargs):
+        super().__init__(doc, dtype=(float, int), **kwargs)
+
+    def validate(self, instance, value):
+        return super().validate(instance, value).astype(float, copy=False)
+
+    @property
+    def info(self):
+        return "{}, stored as floats".format(super().info)
+
+    def sphinx_class(self):
+        # Link to the public base class rather than this private one
+        return ":class:`Array <properties.Array>`"
 
 
 class Array(BaseModel):
@@ -31,8 +74,22 @@ class Array(BaseModel):
 
     Serializing and deserializing this class requires passing an additional
     keyword argument :code:`binary_dict` where the array binary is persisted.
-    The serialized JSON includes array metadata and a UUID; this UUID
-    is the key in the binary_dict.
+    The serialized JSON includes array metadata and a random hex ID; this ID
+    is the key in the binary_dict. The binary_dict value is a memoryview
+    over the array data rather than a copy.
+
+    The serialized array metadata is:
+
+    * **data_type** - Array data type string, one of Int8Array, Uint8Array,
+      Int16Array, Uint16Array, Int32Array, Uint32Array, Int64Array,
+      Uint64Array, Float32Array, Float64Array, or BooleanArray
+    * **shape** - Shape of the array, a list of integers
+    * **size** - Size of the array binary in bytes; boolean arrays are
+      packed to one bit per value
+
+    Arrays assigned to an Array instance are copied. Deserialized numeric
+    arrays are views on the binary data, so they are read-only when that
+    data is immutable; call :code:`.copy()` on the array before modifying it.
     """
 
     schema = "org.omf.v2.array.numeric"
@@ -56,9 +113,21 @@ class Array(BaseModel):
     def __getitem__(self, i):
         return self.array.__getitem__(i)
 
+    def __reduce_ex__(self, protocol):
+        # Pickle protocol 5 can pass the array buffer out-of-band without copying
+        if (
+            protocol >= 5
+            and self.array is not None
+            and self.array.flags.c_contiguous
+            and not self.array.dtype.hasobject
+        ):
+            buffer = pickle.PickleBuffer(self.array)
+            return _rebuild_array, (self.array.dtype, self.array.shape, buffer)
+        return super().__reduce_ex__(protocol)
+
     @properties.validator
     def _validate_data_type(self):
-        if self.array.dtype not in DATA_TYPE_LOOKUP_TO_STRING:
+        if self.array.dtype.str not in _DTYPE_STR_TO_NAME:
             raise properties.ValidationError(
                 "bad dtype: {} - Array must have dtype in {}".format(
                     self.array.dtype,
@@ -67,42 +136,46 @@ class Array(BaseModel):
             )
         return True
 
-    @properties.StringChoice("Array data type string", choices=list(DATA_TYPE_LOOKUP_TO_NUMPY))
+    @property
     def data_type(self):
         """Array type descriptor, determined directly from the array"""
         if self.array is None:
             return None
-        return DATA_TYPE_LOOKUP_TO_STRING.get(self.array.dtype, None)
+        return _DTYPE_STR_TO_NAME.get(self.array.dtype.str, None)
 
-    @properties.List(
-        "Shape of the array",
-        properties.Integer(""),
-    )
+    @property
     def shape(self):
         """Array shape, determined directly from the array"""
         if self.array is None:
             return None
         return list(self.array.shape)
 
-    @properties.Integer("Size of array in bytes")
+    @property
     def size(self):
         """Total size of the array in bytes, determined directly from the array"""
-        if self.array is None:
+        arr = self.array
+        if arr is None:
             return None
-        if self.data_type == "BooleanArray":  # pylint: disable=W0143
-            return int(np.ceil(self.array.size / 8))
-        return self.array.size * self.array.itemsize
+        if arr.dtype == _BOOL_DTYPE:
+            return (arr.size + 7) // 8
+        return arr.size * arr.itemsize
 
     def serialize(self, include_class=True, save_dynamic=False, **kwargs):
-        output = super().serialize(include_class=include_class, save_dynamic=True, **kwargs)
+        output = super().serialize(include_class=include_class, save_dynamic=save_dynamic, **kwargs)
+        if self.array is not None:
+            data_type = self.data_type
+            if data_type is not None:
+                output["data_type"] = data_type
+            output.update({"shape": self.shape, "size": self.size})
         binary_dict = kwargs.get("binary_dict", None)
         if binary_dict is not None:
-            array_uid = str(uuid.uuid4())
-            if self.data_type == "BooleanArray":  # pylint: disable=W0143
-                array_binary = np.packbits(self.array, axis=None).tobytes()
+            array_uid = os.urandom(16).hex()
+            if self.array.dtype == _BOOL_DTYPE:
+                array_binary = np.packbits(self.array, axis=None)
             else:
-                array_binary = self.array.tobytes()
-            binary_dict.update({array_uid: array_binary})
+                array_binary = np.ascontiguousarray(self.array).reshape(-1).view("uint8")
+            # The memoryview keeps a reference to the array so no copy is made
+            binary_dict.update({array_uid: memoryview(array_binary)})
             output.update({"array": array_uid})
         return output
 
@@ -116,16 +189,32 @@ class Array(BaseModel):
         elif value["array"] in binary_dict:
             array_binary = binary_dict[value["array"]]
             array_dtype = DATA_TYPE_LOOKUP_TO_NUMPY[value["data_type"]]
-            if value["data_type"] == "BooleanArray":
+            count = functools.reduce(operator.mul, value["shape"], 1)
+            if array_dtype == _BOOL_DTYPE:
                 int_arr = np.frombuffer(array_binary, dtype="uint8")
-                bit_arr = np.unpackbits(int_arr)[: np.product(value["shape"])]
-                arr = bit_arr.astype(array_dtype)
+                if int_arr.size * 8 < count:
+                    raise ValueError("boolean array binary is smaller than requested size")
+                arr = np.unpackbits(int_arr, count=count).view(array_dtype)
             else:
-                arr = np.frombuffer(array_binary, dtype=array_dtype)
+                arr = np.frombuffer(array_binary, dtype=array_dtype, count=count)
             arr = arr.reshape(value["shape"])
-            return cls(arr)
+            return cls._from_view(arr)
         return cls()
 
+    @classmethod
+    def _from_view(cls, arr):
+        """Wrap an array read from binary data without copying it
+
+        Assigning to the array property copies the value, so user arrays are
+        never aliased. Arrays deserialized from binary data are new views that
+        nothing else refers to, so they are validated and stored directly.
+        """
+        validator = _ArrayViewProperty("", shape={("*",), ("*", "*")}, dtype=(int, float, bool))
+        validator.name = "array"
+        instance = cls()
+        instance._set("array", validator.validate(instance, arr))  # pylint: disable=W0212
+        return instance
+
 
 class ArrayInstanceProperty(properties.Instance):
     """Instance property for OMF Array objects
@@ -144,7 +233,7 @@ class ArrayInstanceProperty(properties.Instance):
     def __init__(self, doc, **kwargs):
         if "instance_class" in kwargs:
             raise AttributeError("ArrayInstanceProperty does not allow custom instance_class")
-        self.validator_prop = properties.Array(
+        self.validator_prop = _ArrayViewProperty(
             "",
             shape={("*",), ("*", "*")},
             dtype=(int, float, bool),
@@ -173,7 +262,10 @@ class ArrayInstanceProperty(properties.Instance):
         self.validator_prop.name = self.name
         value = super().validate(instance, value)
         if value.array is not None:
-            value.array = self.validator_prop.validate(instance, value.array)
+            validated = self.validator_prop.validate(instance, value.array)
+            # Only reassign if validation converted the array, as reassigning copies it
+            if validated is not value.array:
+                value.array = validated
         return value
 
     @property
@@ -186,6 +278,40 @@ class ArrayInstanceProperty(properties.Instance):
         return info
 
 
+# These match the formats accepted by properties.DateTime.from_json for ASCII strings
+_DATE_PATTERN = re.compile(r"(\d{4})[-/](\d\d)[-/](\d\d| [1-9])")
+_DATETIME_PATTERN = re.compile(r"(\d{4})-(\d\d?)-(\d\d?| [1-9])T(\d\d?):(\d\d?):(\d\d?)Z", re.IGNORECASE)
+
+
+def _is_datetime_string(value):
+    """Check if value is a string that properties.DateTime would accept"""
+    if not isinstance(value, str):
+        return False
+    if not value.isascii():
+        # strptime accepts some non-ASCII digits but not others, so ask it directly
+        try:
+            properties.DateTime.from_json(value)
+        except ValueError:
+            return False
+        return True
+    if len(value) == 10:
+        match = _DATE_PATTERN.fullmatch(value)
+    else:
+        match = _DATETIME_PATTERN.fullmatch(value)
+    if match is None:
+        return False
+    try:
+        datetime.datetime(*(int(group) for group in match.groups()))
+    except ValueError:
+        return False
+    return True
+
+
+def _is_datetime_list(values):
+    """Check if all values are datetime strings, stopping at the first that is not"""
+    return all(_is_datetime_string(value) for value in values)
+
+
 class StringList(BaseModel):
     """Class to validate and serialize a large list of strings
 
@@ -193,8 +319,19 @@ class StringList(BaseModel):
 
     Serializing and deserializing this class requires passing an additional
     keyword argument :code:`binary_dict` where the string list is persisted.
-    The serialized JSON includes array metadata and a UUID; this UUID
+    The serialized JSON includes array metadata and a random hex ID; this ID
     is the key in the binary_dict.
+
+    The serialized list metadata is:
+
+    * **data_type** - List data type string, DateTimeArray if every value is
+      a date or datetime string, otherwise StringArray
+    * **shape** - Shape of the string list, a list holding its length
+    * **size** - Size of the string list dumped to JSON in bytes
+
+    The binary is the list dumped to UTF-8 encoded JSON. This layout is part
+    of the OMF v2 file format, so it is kept even though a packed offsets
+    and data buffer would be smaller and faster to read.
     """
 
     schema = "org.omf.v2.array.string"
@@ -217,42 +354,39 @@ class StringList(BaseModel):
     def __getitem__(self, i):
         return self.array.__getitem__(i)
 
-    @properties.StringChoice("List data type string", choices=["DateTimeArray", "StringArray"])
+    @property
     def data_type(self):
-        """Array type descriptor, determined directly from the array"""
+        """Array type descriptor, either DateTimeArray or StringArray"""
         if self.array is None:
             return None
-        try:
-            properties.List("", properties.DateTime("")).validate(self, self.array)
-        except properties.ValidationError:
-            return "StringArray"
-        return "DateTimeArray"
+        if _is_datetime_list(self.array):
+            return "DateTimeArray"
+        return "StringArray"
 
-    @properties.List(
-        "Shape of the string list",
-        properties.Integer(""),
-        min_length=1,
-        max_length=1,
-    )
+    @property
     def shape(self):
         """Array shape, determined directly from the array"""
         if self.array is None:
             return None
         return [len(self.array)]
 
-    @properties.Integer("Size of string list dumped to JSON in bytes")
+    @property
     def size(self):
-        """Total size of the string list in bytes"""
+        """Total size of the string list dumped to JSON in bytes"""
         if self.array is None:
             return None
         return len(json.dumps(self.array))
 
     def serialize(self, include_class=True, save_dynamic=False, **kwargs):
-        output = super().serialize(include_class=include_class, save_dynamic=True, **kwargs)
+        output = super().serialize(include_class=include_class, save_dynamic=save_dynamic, **kwargs)
+        # Dump to JSON once and use it for both size and the binary
+        array_binary = bytes(json.dumps(self.array), "utf8")
+        if self.array is not None:
+            output.update({"data_type": self.data_type, "shape": self.shape, "size": len(array_binary)})
         binary_dict = kwargs.get("binary_dict", None)
         if binary_dict is not None:
-            array_uid = str(uuid.uuid4())
-            binary_dict.update({array_uid: bytes(json.dumps(self.array), "utf8")})
+            array_uid = os.urandom(16).hex()
+            binary_dict.update({array_uid: array_binary})
             output.update({"array": array_uid})
         return output
 
@@ -264,7 +398,7 @@ class StringList(BaseModel):
         elif any(key not in value for key in ["shape", "data_type", "array"]):
             pass
         elif value["array"] in binary_dict:
-            arr = json.loads(binary_dict[value["array"]].decode("utf8"))
+            arr = json.loads(str(binary_dict[value["array"]], "utf8"))
             return cls(arr)
         return cls()
 
@@ -297,11 +431,9 @@ class ContinuousColormap(ContentModel):
         shape=("*", 3),
         dtype=int,
     )
-    limits = properties.List(
+    limits = _FloatArrayProperty(
         "Attribute range associated with the gradient",
-        prop=properties.Float(""),
-        min_length=2,
-        max_length=2,
+        shape=(2,),
         default=properties.undefined,
     )
 
@@ -309,12 +441,11 @@ class ContinuousColormap(ContentModel):
     def _check_gradient_values(self, change):
         """Ensure gradient values are all between 0 and 255"""
         arr = change["value"].array
-        if arr is None:
+        if arr is None or arr.dtype == np.uint8:
             return
-        arr_uint8 = arr.astype("uint8")
-        if not np.array_equal(arr, arr_uint8):
+        if arr.size and (arr.min() < 0 or arr.max() > 255):
             raise properties.ValidationError("Gradient must be an array of RGB values between 0 and 255")
-        change["value"].array = arr_uint8
+        change["value"].array = arr.astype(np.uint8, copy=False)
 
     @properties.validator("limits")
     def _check_limits_on_change(self, change):
@@ -352,9 +483,9 @@ class DiscreteColormap(ContentModel):
 
     schema = "org.omf.v2.colormap.discrete"
 
-    end_points = properties.List(
+    end_points = _FloatArrayProperty(
         "Attribute values associated with edge of color intervals",
-        prop=properties.Float(""),
+        shape=("*",),
         default=properties.undefined,
     )
     end_inclusive = properties.List(
@@ -381,10 +512,8 @@ class DiscreteColormap(ContentModel):
 
     @properties.validator("end_points")
     def _validate_end_points_monotonic(self, change):
-        for i in range(len(change["value"]) - 1):
-            diff = change["value"][i + 1] - change["value"][i]
-            if diff < 0:
-                raise properties.ValidationError("end_points must be monotonically increasing")
+        if (np.diff(change["value"]) < 0).any():
+            raise properties.ValidationError("end_points must be monotonically increasing")
 
 
 class NumericAttribute(ProjectElementAttribute):
@@ -471,6 +600,9 @@ class CategoryColormap(ContentModel):
         required=False,
     )
 
+    _index_map = None
+    _sorted_indices = None
+
     @properties.validator
     def _validate_lengths(self):
         """Validate indices, values, and colors are all the same length"""
@@ -480,6 +612,45 @@ class CategoryColormap(ContentModel):
             return True
         raise properties.ValidationError("Legend colors and values must be the same length")
 
+    @properties.observer(("indices", "values", "colors"))
+    def _reset_lookup(self, _):
+        self._index_map = None
+        self._sorted_indices = None
+
+    def _build_lookup(self):
+        """Build the index to (value, color) map and the sorted indices"""
+        colors = [None] * len(self.values) if self.colors is None else self.colors
+        index_map = {}
+        for index, value, color in zip(self.indices, self.values, colors):
+            # The first occurrence of a repeated index wins
+            index_map.setdefault(index, (value, color))
+        self._index_map = index_map
+        self._sorted_indices = np.array(sorted(index_map), dtype=np.int64)
+
+    def lookup(self, index):
+        """Return the (value, color) pair for a category index
+
+        Color is None if the colormap has no colors. Returns None if the
+        index has no category. If an index is repeated in indices, its first
+        occurrence is used. The lookup table is built on first use and
+        rebuilt after indices, values, or colors are set, but not when those
+        lists are modified in place.
+        """
+        if self._index_map is None:
+            self._build_lookup()
+        return self._index_map.get(index)
+
+    def has_category(self, array):
+        """Return a boolean array, True where array values are category indices"""
+        if self._sorted_indices is None:
+            self._build_lookup()
+        arr = np.asarray(array)
+        sorted_indices = self._sorted_indices
+        if not sorted_indices.size:
+            return np.zeros(arr.shape, dtype=bool)
+        positions = np.minimum(np.searchsorted(sorted_indices, arr), sorted_indices.size - 1)
+        return sorted_indices[positions] == arr
+
 
 class CategoryAttribute(ProjectElementAttribute):
     """Attribute of indices linked to category values
@@ -1,8 +1,8 @@
 """base.py: OMF Project and base classes for its components"""
+import functools
 import json
 
 import properties
-import properties.extras
 
 
 class BaseModel(properties.HasProperties):
@@ -13,6 +13,13 @@ class BaseModel(properties.HasProperties):
     """
 
     schema = ""
+    _SCHEMA_TO_CLASS_NAME = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # The first class to define a schema owns it; subclasses only inherit it
+        if cls.__dict__.get("schema"):
+            BaseModel._SCHEMA_TO_CLASS_NAME.setdefault(cls.schema, cls.__name__)
 
     def serialize(self, include_class=True, save_dynamic=False, **kwargs):
         output = super().serialize(include_class, save_dynamic, **kwargs)
@@ -21,10 +28,10 @@ class BaseModel(properties.HasProperties):
 
     @classmethod
     def __lookup_class(cls, schema):
-        for class_name, class_value in cls._REGISTRY.items():
-            if hasattr(class_value, "schema") and class_value.schema == schema:
-                return class_name
-        raise ValueError(f"schema not found: {schema}")
+        class_name = cls._SCHEMA_TO_CLASS_NAME.get(schema)
+        if class_name is None:
+            raise ValueError(f"schema not found: {schema}")
+        return class_name
 
     @classmethod
     def deserialize(cls, value, trusted=False, strict=False, assert_valid=False, **kwargs):
@@ -104,6 +111,23 @@ class AttributeMetadata(BaseMetadata):
     )
 
 
+def _is_json_native(value):
+    """Check if value is built only from types json.dumps accepts directly"""
+    if value is None or isinstance(value, (str, int, float)):
+        return True
+    if isinstance(value, (list, tuple)):
+        return all(_is_json_native(item) for item in value)
+    if isinstance(value, dict):
+        return all(isinstance(key, str) and _is_json_native(item) for key, item in value.items())
+    return False
+
+
+@functools.lru_cache(maxsize=256)
+def _metadata_prop_keys(metadata_class, keys):
+    """Keys that correspond to properties on metadata_class, in their original order"""
+    return tuple(key for key in keys if key in metadata_class._props)  # pylint: disable=W0212
+
+
 class ArbitraryMetadataDict(properties.Dictionary):
     """Custom property class for metadata dictionaries
 
@@ -135,13 +159,9 @@ class ArbitraryMetadataDict(properties.Dictionary):
         coerced values persist.
         """
         new_value = super().validate(instance, value)
-        filtered_value = properties.utils.filter_props(
-            self.metadata_class,
-            new_value,
-        )[0]
         try:
-            for key, val in filtered_value.items():
-                new_value[key] = self.metadata_class._props[key].validate(instance, val)
+            for key in _metadata_prop_keys(self.metadata_class, tuple(new_value)):
+                new_value[key] = self.metadata_class._props[key].validate(instance, new_value[key])
         except properties.ValidationError as err:
             raise properties.ValidationError(
                 "Invalid metadata: {}".format(err),
@@ -150,7 +170,8 @@ class ArbitraryMetadataDict(properties.Dictionary):
                 instance=instance,
             ) from err
         try:
-            json.dumps(new_value)
+            if not _is_json_native(new_value):
+                json.dumps(new_value)
         except TypeError as err:
             raise properties.ValidationError(
                 "Metadata is not JSON compatible",
@@ -248,24 +269,19 @@ class ProjectElement(ContentModel):
     def _validate_attributes(self):
         """Check if element is built correctly"""
         assert self._valid_locations, "ProjectElement needs _valid_locations"
+        location_lengths = {}
         for i, attr in enumerate(self.attributes):
-            if attr.location not in self._valid_locations:  # pylint: disable=W0212
-                raise properties.ValidationError(
-                    "Invalid location {loc} - valid values: {locs}".format(
-                        loc=attr.location,
-                        locs=", ".join(self._valid_locations),  # pylint: disable=W0212
-                    )
-                )
-            valid_length = self.location_length(attr.location)
-            if len(attr.array.array) != valid_length:
+            location = attr.location
+            if location not in self._valid_locations:  # pylint: disable=W0212
+                valid_locations = ", ".join(self._valid_locations)  # pylint: disable=W0212
+                raise properties.ValidationError(f"Invalid location {location} - valid values: {valid_locations}")
+            if location not in location_lengths:
+                location_lengths[location] = self.location_length(location)
+            valid_length = location_lengths[location]
+            attr_length = len(attr.array.array)
+            if attr_length != valid_length:
                 raise properties.ValidationError(
-                    "attributes[{index}] length {attrlen} does not match "
-                    "{loc} length {meshlen}".format(
-                        index=i,
-                        attrlen=len(attr.array.array),
-                        loc=attr.location,
-                        meshlen=valid_length,
-                    )
+                    f"attributes[{i}] length {attr_length} does not match {location} length {valid_length}"
                 )
         return True
 
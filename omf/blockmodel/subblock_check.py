@@ -1,11 +1,11 @@
 """blockmodel/_subblock_check.py: functions for checking sub-block constraints."""
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import numpy as np
 import properties
 
 from .index import ijk_to_index
-from .subblocks import FreeformSubblocks, RegularSubblocks
+from .subblocks import FreeformSubblocks, RegularSubblocks, _is_validated, _mark_validated
 
 __all__ = ["subblock_check"]
 
@@ -32,6 +32,34 @@ def _sizes_to_ints(sizes):
     return sizes.sum(axis=1)
 
 
+# Parent blocks with fewer sub-blocks than this are checked for overlaps in a loop,
+# which is quicker than building the per-axis masks for so few sub-blocks.
+_SMALL_GROUP_SIZE = 8
+
+# The mask product costs the number of sub-blocks times the number of cells in the
+# parent. Above this budget the loop, which only touches covered cells, is quicker.
+_MAX_EINSUM_WORK = 2**18
+
+# Largest lookup table, in bytes, that _all_sizes_valid will allocate.
+_MAX_LOOKUP_SIZE = 2**20
+
+
+def _all_sizes_valid(sizes, valid_sizes, subblock_count):
+    """Check every row of sizes is one of valid_sizes.
+
+    Sizes must already be known to lie between 1 and subblock_count. A boolean
+    lookup table indexed by size is used when it is small enough, otherwise
+    the sizes are packed into integers and checked with np.isin.
+    """
+    table_shape = tuple(int(count) + 1 for count in subblock_count)
+    if np.prod(table_shape) > _MAX_LOOKUP_SIZE:
+        return np.isin(_sizes_to_ints(sizes), _sizes_to_ints(valid_sizes)).all()
+    valid_sizes = np.asarray(valid_sizes)
+    table = np.zeros(table_shape, dtype=bool)
+    table[valid_sizes[:, 0], valid_sizes[:, 1], valid_sizes[:, 2]] = True
+    return table[sizes[:, 0], sizes[:, 1], sizes[:, 2]].all()
+
+
 @dataclass
 class _Checker:
     # pylint: disable=too-many-instance-attributes
@@ -43,6 +71,13 @@ class _Checker:
     octree: bool = False
     full: bool = False
     instance: object = None
+    min_corners: np.ndarray = field(init=False, repr=False)
+    max_corners: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # Contiguous copies are quicker to scan repeatedly than strided column views.
+        self.min_corners = np.ascontiguousarray(self.corners[:, :3])
+        self.max_corners = np.ascontiguousarray(self.corners[:, 3:])
 
     def check(self):
         """Run all checks on the given defintions and sub-blocks."""
@@ -71,8 +106,8 @@ class _Checker:
             )
 
     def _check_inside_parent(self):
-        min_corners = self.corners[:, :3]
-        max_corners = self.corners[:, 3:]
+        min_corners = self.min_corners
+        max_corners = self.max_corners
         if min_corners.dtype.kind != "u" and not (0 <= min_corners).all():
             self._error("0 <= min_corner failed", prop="subblock_corners")
         if not (min_corners < max_corners).all():
@@ -82,26 +117,23 @@ class _Checker:
             self._error(f"max_corner <= {upper} failed", prop="subblock_corners")
 
     def _check_octree(self):
-        min_corners = self.corners[:, :3]
-        max_corners = self.corners[:, 3:]
-        sizes = max_corners - min_corners
+        min_corners = self.min_corners
+        sizes = self.max_corners - min_corners
         # Sizes.
         count = self.subblock_count.copy()
         valid_sizes = [count.copy()]
         while (count > 1).any():
             count[count > 1] //= 2
             valid_sizes.append(count.copy())
-        valid_sizes = _sizes_to_ints(valid_sizes)
-        if not np.isin(_sizes_to_ints(sizes), valid_sizes).all():
+        if not _all_sizes_valid(sizes, valid_sizes, self.subblock_count):
             self._error("found non-octree sub-block sizes", prop="subblock_corners")
         # Positions; octree blocks always start at a multiple of their size.
         if (np.remainder(min_corners, sizes) != 0).any():
             self._error("found non-octree sub-block positions", prop="subblock_corners")
 
     def _check_full(self):
-        valid_sizes = _sizes_to_ints([self.subblock_count, (1, 1, 1)])
-        sizes = self.corners[:, 3:] - self.corners[:, :3]
-        if not np.isin(_sizes_to_ints(sizes), valid_sizes).all():
+        sizes = self.max_corners - self.min_corners
+        if not _all_sizes_valid(sizes, [self.subblock_count, (1, 1, 1)], self.subblock_count):
             self._error("found sub-block size that does not match 'full' mode'", prop="subblock_corners")
 
     def _check_for_overlaps(self):
@@ -117,10 +149,22 @@ class _Checker:
                 self._check_group_for_overlaps(self.corners[start:end])
 
     def _check_group_for_overlaps(self, corners_in_one_parent):
-        # This won't be very fast but there doesn't seem to be a better option.
-        tracker = np.zeros(self.subblock_count[::-1], dtype=int)
-        for min_i, min_j, min_k, max_i, max_j, max_k in corners_in_one_parent:
-            tracker[min_k:max_k, min_j:max_j, min_i:max_i] += 1
+        count = len(corners_in_one_parent)
+        if count < _SMALL_GROUP_SIZE or count * np.prod(self.subblock_count) > _MAX_EINSUM_WORK:
+            tracker = np.zeros(self.subblock_count[::-1], dtype=int)
+            for min_i, min_j, min_k, max_i, max_j, max_k in corners_in_one_parent:
+                tracker[min_k:max_k, min_j:max_j, min_i:max_i] += 1
+        else:
+            # For each axis, mark which cells of the sub-block grid each sub-block spans.
+            # Multiplying those masks together and summing over the sub-blocks counts how
+            # many sub-blocks cover each cell, without a Python loop over the sub-blocks.
+            masks = []
+            for axis, cells_on_axis in enumerate(self.subblock_count):
+                cells = np.arange(cells_on_axis)
+                low = corners_in_one_parent[:, axis, np.newaxis]
+                high = corners_in_one_parent[:, axis + 3, np.newaxis]
+                masks.append(((low <= cells) & (cells < high)).astype(np.int32))
+            tracker = np.einsum("ni,nj,nk->ijk", *masks)
         if (tracker > 1).any():
             self._error("found overlapping sub-blocks", prop="subblock_corners")
 
@@ -130,25 +174,35 @@ def subblock_check(model):
 
     Raises properties.ValidationError if there is a problem.
     """
-    if isinstance(model.subblocks, RegularSubblocks):
+    subblocks = model.subblocks
+    if isinstance(subblocks, RegularSubblocks):
+        subblock_count = subblocks.subblock_count
+    elif isinstance(subblocks, FreeformSubblocks):
+        subblock_count = np.array((1.0, 1.0, 1.0))
+    else:
+        return
+    # Skip the checks, and building the checker, if nothing has changed since they last passed.
+    state = (tuple(model.block_count), tuple(subblock_count), getattr(subblocks, "mode", None))
+    if _is_validated(subblocks, state):
+        return
+    if isinstance(subblocks, RegularSubblocks):
         checker = _Checker(
-            parent_indices=model.subblocks.parent_indices.array,
-            corners=model.subblocks.corners.array,
+            parent_indices=subblocks.parent_indices.array,
+            corners=subblocks.corners.array,
             block_count=model.block_count,
-            subblock_count=model.subblocks.subblock_count,
+            subblock_count=subblock_count,
             regular=True,
-            octree=model.subblocks.mode == "octree",
-            full=model.subblocks.mode == "full",
-            instance=model.subblocks,
+            octree=subblocks.mode == "octree",
+            full=subblocks.mode == "full",
+            instance=subblocks,
         )
-    elif isinstance(model.subblocks, FreeformSubblocks):
+    else:
         checker = _Checker(
-            parent_indices=model.subblocks.parent_indices.array,
-            corners=model.subblocks.corners.array,
+            parent_indices=subblocks.parent_indices.array,
+            corners=subblocks.corners.array,
             block_count=model.block_count,
-            subblock_count=np.array((1.0, 1.0, 1.0)),
-            instance=model.subblocks,
+            subblock_count=subblock_count,
+            instance=subblocks,
         )
-    else:
-        return
     checker.check()
+    _mark_validated(subblocks, state)
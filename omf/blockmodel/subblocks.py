@@ -4,14 +4,85 @@ import properties
 
 from ..attribute import ArrayInstanceProperty
 from ..base import BaseModel
+from .index import ijk_to_index
 
 __all__ = ["FreeformSubblocks", "RegularSubblocks"]
 
 
 def _shrink_uint(arr):
-    kind = arr.array.dtype.kind
-    if kind == "u" or (kind == "i" and arr.array.min() >= 0):
-        arr.array = arr.array.astype(np.min_scalar_type(arr.array.max()))
+    values = arr.array
+    kind = values.dtype.kind
+    if kind == "i":
+        if values.min() < 0:
+            return
+    elif kind != "u":
+        return
+    largest = int(values.max())
+    if largest < 2**8:
+        dtype = np.uint8
+    elif largest < 2**16:
+        dtype = np.uint16
+    elif largest < 2**32:
+        dtype = np.uint32
+    else:
+        dtype = np.uint64
+    if values.dtype != dtype:
+        arr.array = values.astype(dtype)
+
+
+def _is_immutable(arr):
+    """Check that the data of an array can't be changed through it or anything it views.
+
+    A cleared writeable flag isn't enough: it can be set again on an array that owns its
+    data, and a read-only view may have a writeable base. The chain of bases must end in
+    a read-only buffer, like bytes or a read-only memory map, with nothing writeable on
+    the way.
+    """
+    base = arr
+    while base is not None:
+        if isinstance(base, np.ndarray):
+            if base.flags.writeable:
+                return False
+            base = base.base
+        elif isinstance(base, memoryview):
+            if not base.readonly:
+                return False
+            base = base.obj
+        else:
+            try:
+                return memoryview(base).readonly
+            except TypeError:
+                return False
+    return False
+
+
+def _read_only_arrays(subblocks):
+    """Return the parent indices and corners arrays if neither can be modified in place."""
+    if subblocks.parent_indices is None or subblocks.corners is None:
+        return None
+    arrays = (subblocks.parent_indices.array, subblocks.corners.array)
+    if any(arr is None or not _is_immutable(arr) for arr in arrays):
+        return None
+    return arrays
+
+
+def _is_validated(subblocks, state=None):
+    """Check if the sub-blocks already passed validation with the same read-only arrays.
+
+    Arrays that could be written to are never treated as validated because they may have
+    been changed in place. If `state` is given it must also match the state recorded at validation.
+    """
+    arrays = _read_only_arrays(subblocks)
+    if arrays is None or subblocks._validated is None:  # pylint: disable=W0212
+        return False
+    old_arrays, old_state = subblocks._validated  # pylint: disable=W0212
+    return all(old is new for old, new in zip(old_arrays, arrays)) and (state is None or state == old_state)
+
+
+def _mark_validated(subblocks, state):
+    """Record that the sub-blocks passed validation, if their arrays are read-only."""
+    arrays = _read_only_arrays(subblocks)
+    subblocks._validated = None if arrays is None else (arrays, state)  # pylint: disable=W0212
 
 
 class RegularSubblocks(BaseModel):
@@ -72,27 +143,47 @@ class RegularSubblocks(BaseModel):
 
     @properties.validator("subblock_count")
     def _validate_subblock_count(self, change):
-        for item in change["value"]:
-            if item < 1:
-                raise properties.ValidationError("sub-block counts must be >= 1", prop=change["name"], instance=self)
+        if (np.asarray(change["value"]) < 1).any():
+            raise properties.ValidationError("sub-block counts must be >= 1", prop=change["name"], instance=self)
+
+    _validated = None
 
     @properties.validator
     def _validate(self):
-        _shrink_uint(self.parent_indices)
-        _shrink_uint(self.corners)
+        if not _is_validated(self):
+            _shrink_uint(self.parent_indices)
+            _shrink_uint(self.corners)
         if self.mode == "octree":
-            for item in self.subblock_count:
-                log = np.log2(item)
-                if np.trunc(log) != log:
-                    raise properties.ValidationError(
-                        "in octree mode sub-block counts must be powers of two", prop="subblock_count", instance=self
-                    )
+            counts = self.subblock_count.astype(np.int64, copy=False)
+            if (counts < 1).any() or (counts & (counts - 1)).any():
+                raise properties.ValidationError(
+                    "in octree mode sub-block counts must be powers of two", prop="subblock_count", instance=self
+                )
 
     @property
     def num_subblocks(self):
         """The total number of sub-blocks."""
         return None if self.corners is None else len(self.corners)
 
+    def per_parent_counts(self, block_count):
+        """Count the sub-blocks and the volume they cover in every parent block.
+
+        Returns two arrays of length `prod(block_count)`, ordered by flat parent index as
+        in `BlockModel.ijk_to_index`. The first holds the number of sub-blocks in each parent,
+        the second the volume they cover in sub-block cells. A fully covered parent has a
+        volume equal to the product of `subblock_count`.
+        """
+        if self.parent_indices is None or self.corners is None:
+            raise ValueError("parent_indices and corners are not yet known")
+        block_count = np.asarray(block_count)
+        num_parents = int(np.prod(block_count))
+        flat_indices = ijk_to_index(block_count, self.parent_indices.array)
+        corners = self.corners.array.astype(np.int64)
+        volumes = np.prod(corners[:, 3:] - corners[:, :3], axis=1)
+        counts = np.bincount(flat_indices, minlength=num_parents)
+        covered = np.bincount(flat_indices, weights=volumes, minlength=num_parents).astype(np.int64)
+        return counts, covered
+
 
 class FreeformSubblocks(BaseModel):
     """Defines free-form sub-blocks for a block model.
@@ -128,9 +219,12 @@ class FreeformSubblocks(BaseModel):
         dtype=float,
     )
 
+    _validated = None
+
     @properties.validator
     def _validate(self):
-        _shrink_uint(self.parent_indices)
+        if not _is_validated(self):
+            _shrink_uint(self.parent_indices)
 
     @property
     def num_subblocks(self):
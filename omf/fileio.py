@@ -1,7 +1,9 @@
 """fileio.py: OMF Writer and Reader for serializing to and from .omf files"""
 import datetime
 import json
+import mmap
 import os
+import struct
 import zipfile
 
 from .base import Project
@@ -10,6 +12,22 @@ from . import compat
 __version__ = "2.0.0a0"
 OMF_VERSION = "2.0"
 
+# Binaries are compressed and written in chunks of this many bytes.
+_WRITE_CHUNK_SIZE = 2**24
+
+
+def _write_binary(zip_file, info, data):
+    """Write binary data to a new zip member one chunk at a time
+
+    This avoids holding the whole compressed binary in memory, as
+    ZipFile.writestr does, and works on any buffer without copying it.
+    """
+    view = memoryview(data)
+    info.file_size = view.nbytes
+    with zip_file.open(info, mode="w") as file:
+        for start in range(0, view.nbytes, _WRITE_CHUNK_SIZE):
+            file.write(view[start : start + _WRITE_CHUNK_SIZE])
+
 
 def save(project, filename, mode="x"):
     """Serialize a OMF project to a file
@@ -54,14 +72,41 @@ def save(project, filename, mode="x"):
                 date_time=time_tuple,
             )
             binary_info.compress_type = zipfile.ZIP_DEFLATED
-            zip_file.writestr(binary_info, value)
+            _write_binary(zip_file, binary_info, value)
     return filename
 
 
+def _is_mappable(info):
+    """Check if a zip member is stored uncompressed and unencrypted"""
+    return info.compress_type == zipfile.ZIP_STORED and not info.flag_bits & 0x1
+
+
+def _map_file(filename):
+    """Memory-map a whole file read-only"""
+    with open(filename, "rb") as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _member_view(info, file_map):
+    """Return a memoryview over the data of an uncompressed zip member
+
+    The view holds a reference to the memory map, so pages are only read
+    from disk when the data is accessed.
+    """
+    start = info.header_offset
+    header = file_map[start : start + zipfile.sizeFileHeader]
+    if len(header) != zipfile.sizeFileHeader or header[:4] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile("Bad magic number for file header: {}".format(info.filename))
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    start += zipfile.sizeFileHeader + name_length + extra_length
+    return memoryview(file_map)[start : start + info.file_size]
+
+
 # pylint: disable=too-few-public-methods
 class _Reader(compat.IOMFReader):
-    def __init__(self, filename: str):
+    def __init__(self, filename: str, memory_map: bool = False):
         self._filename = filename
+        self._memory_map = memory_map
 
     def load(self, include_binary: bool = True, project_json: str = None) -> Project:
         project_dict = {}
@@ -70,12 +115,20 @@ class _Reader(compat.IOMFReader):
 
         try:
             with zipfile.ZipFile(file=self._filename, mode="r") as zip_file:
+                file_map = None
                 for info in zip_file.infolist():
-                    with zip_file.open(info, mode="r") as file:
-                        if info.filename == "project.json":
+                    if info.filename == "project.json":
+                        with zip_file.open(info, mode="r") as file:
                             project_dict = json.load(file)
                             project_version = project_dict.pop("version")
-                        elif include_binary:
+                    elif not include_binary:
+                        continue
+                    elif self._memory_map and _is_mappable(info) and info.file_size:
+                        if file_map is None:
+                            file_map = _map_file(self._filename)
+                        binary_dict[info.filename] = _member_view(info, file_map)
+                    else:
+                        with zip_file.open(info, mode="r") as file:
                             binary_dict[info.filename] = file.read()
 
         except zipfile.BadZipFile as exc:
@@ -92,14 +145,18 @@ class _Reader(compat.IOMFReader):
         return Project.deserialize(value=project_dict, binary_dict=binary_dict, trusted=True)
 
 
-def load(filename: str, include_binary: bool = True, project_json: str = None) -> Project:
+def load(filename: str, include_binary: bool = True, project_json: str = None, memory_map: bool = False) -> Project:
     """Deserialize an OMF file into a project
 
     **Inputs:**
 
     * **filename** - Name and path of input OMF file
     * **include_binary** - If True, binary data from the OMF file will be
-      loaded into memory. Default is True
+      loaded into memory. Default is True.
+    * **memory_map** - If True, binary data stored uncompressed in the file
+      is memory-mapped rather than read, so it is only loaded when accessed.
+      The resulting arrays are read-only and the file must not be modified
+      or overwritten while they are in use. Default is False.
     * **project_json** - Alternative JSON used to construct the output OMF
       project. By default, the project JSON from the OMF file is used.
 
@@ -124,7 +181,7 @@ def load(filename: str, include_binary: bool = True, project_json: str = None) -
 
     for reader_cls in [_Reader] + compat.compatible_omf_readers:
         try:
-            reader = reader_cls(filename)
+            reader = _Reader(filename, memory_map=memory_map) if reader_cls is _Reader else reader_cls(filename)
             return reader.load(include_binary=include_binary, project_json=project_json)
         except compat.WrongVersionError:
             continue
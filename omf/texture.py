@@ -1,6 +1,6 @@
 """texture.py: contains Texture definitions"""
 import io
-import uuid
+import os
 
 import properties
 
@@ -15,7 +15,7 @@ class Image(BaseModel):
 
     Serializing and deserializing this class requires passing an additional
     keyword argument :code:`binary_dict` where the image binary is persisted.
-    The serialized JSON includes image metadata and a UUID; this UUID
+    The serialized JSON includes image metadata and a random hex ID; this ID
     is the key in the binary_dict.
     """
 
@@ -48,7 +48,7 @@ class Image(BaseModel):
 
     def serialize(self, include_class=True, save_dynamic=False, **kwargs):
         output = super().serialize(include_class=include_class, save_dynamic=True, **kwargs)
-        image_uid = str(uuid.uuid4())
+        image_uid = os.urandom(16).hex()
         binary_dict = kwargs.get("binary_dict", None)
         if binary_dict is not None:
             self.image.seek(0)
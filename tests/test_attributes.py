@@ -1,5 +1,6 @@
 """Tests for attribute object validation"""
 import datetime
+import pickle
 
 import numpy as np
 import properties
@@ -31,6 +32,76 @@ def test_scalar_array():
     assert properties.equal(arr, new_arr)
 
 
+def test_non_contiguous_array():
+    """Test non-contiguous arrays serialize in C order without a bytes copy"""
+    arr = omf.attribute.Array(np.arange(6, dtype="int32").reshape(2, 3).T)
+    binary_dict = {}
+    output = arr.serialize(include_class=False, binary_dict=binary_dict)
+    array_binary = binary_dict[output["array"]]
+    assert isinstance(array_binary, memoryview)
+    assert array_binary.nbytes == arr.size
+    assert bytes(array_binary) == arr.array.tobytes()
+    new_arr = omf.attribute.Array.deserialize(output, binary_dict=binary_dict)
+    assert properties.equal(arr, new_arr)
+
+
+def test_array_reassign():
+    """Test data type, shape, and size update when the array is reassigned"""
+    arr = omf.attribute.Array(np.array([1, 2, 3], dtype="int64"))
+    assert arr.data_type == "Int64Array"
+    assert arr.size == 24
+    arr.array = arr.array.astype("uint8")
+    assert arr.data_type == "Uint8Array"
+    assert arr.size == 3
+    arr.array = np.array([[True, False]])
+    assert arr.data_type == "BooleanArray"
+    assert arr.shape == [1, 2]
+    assert arr.size == 1
+
+
+def test_array_copies_input():
+    """Test assigned arrays are copied but deserialized binaries are not"""
+    values = np.zeros(3)
+    attr = omf.NumericAttribute(array=values)
+    values[0] = 5
+    assert attr.array.array[0] == 0
+    binary_dict = {}
+    output = attr.array.serialize(binary_dict=binary_dict)
+    new_arr = omf.attribute.Array.deserialize(output, binary_dict=binary_dict)
+    assert np.shares_memory(new_arr.array, attr.array.array)
+    attr.array = new_arr
+    assert attr.array is new_arr
+    assert np.shares_memory(attr.array.array, new_arr.array)
+
+
+def test_array_modified_in_place():
+    """Test shape is serialized correctly after the array is reshaped in place"""
+    arr = omf.attribute.Array(np.arange(6.0))
+    assert arr.shape == [6]
+    arr.array.shape = (2, 3)
+    assert arr.shape == [2, 3]
+    binary_dict = {}
+    output = arr.serialize(binary_dict=binary_dict)
+    assert output["shape"] == [2, 3]
+    new_arr = omf.attribute.Array.deserialize(output, binary_dict=binary_dict)
+    assert new_arr.array.shape == (2, 3)
+
+
+@pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+def test_pickle_array(protocol):
+    """Test arrays pickle, with out-of-band buffers on protocol 5"""
+    arr = omf.attribute.Array(np.array([[1.0, 2.0], [3.0, 4.0]]))
+    if protocol >= 5:
+        buffers = []
+        data = pickle.dumps(arr, protocol=protocol, buffer_callback=buffers.append)
+        assert len(buffers) == 1
+        new_arr = pickle.loads(data, buffers=buffers)
+    else:
+        new_arr = pickle.loads(pickle.dumps(arr, protocol=protocol))
+    assert isinstance(new_arr, omf.attribute.Array)
+    assert properties.equal(arr, new_arr)
+
+
 def test_invalid_array():
     """Test Array class without valid array"""
     arr = omf.attribute.Array()
@@ -72,6 +143,16 @@ def test_boolean_array():
     assert properties.equal(arr, new_arr)
 
 
+def test_truncated_boolean_array():
+    """Test boolean arrays with too little binary data are rejected"""
+    arr = omf.attribute.Array(np.arange(20) % 2 == 0)
+    binary_dict = {}
+    output = arr.serialize(include_class=False, binary_dict=binary_dict)
+    binary_dict[output["array"]] = bytes(binary_dict[output["array"]])[:1]
+    with pytest.raises(ValueError, match="smaller than requested size"):
+        omf.attribute.Array.deserialize(output, binary_dict=binary_dict)
+
+
 def test_datetime_list():
     """Test string list gives datetime data_type"""
     arr = omf.attribute.StringList(["1995-08-12T18:00:00Z", "1995-08-13T18:00:00Z"])
@@ -89,6 +170,22 @@ def test_datetime_list():
     }
 
 
+@pytest.mark.parametrize(
+    ("values", "data_type"),
+    [
+        (["1995/08/12", "1995-08-13", "1995-08-12T18:00:00Z", "1995-8-1T1:02:03Z"], "DateTimeArray"),
+        (["1995-08-12T18:00:00Z", "1995-02-30T18:00:00Z"], "StringArray"),
+        (["1995-08-12T18:00:00Z", "1995-08-12 18:00:00Z"], "StringArray"),
+        (["1995-08-12", "a"], "StringArray"),
+        (["1995-0\u0663-12"], "StringArray"),
+        (["\u0661\u0669\u0669\u0665-08-12"], "DateTimeArray"),
+    ],
+)
+def test_string_list_data_type(values, data_type):
+    """Test string lists are only DateTimeArrays if every value is a valid datetime"""
+    assert omf.attribute.StringList(values).data_type == data_type
+
+
 def test_string_list():
     """Test string list gives string data_type"""
     arr = omf.attribute.StringList.deserialize(
@@ -169,10 +266,16 @@ def test_contiuous_colormap():
         cmap.validate()
     cmap.limits[0] = 0.0
     cmap.validate()
+    cmap.limits = [0, 1]
+    assert cmap.limits.dtype == np.float64
+    assert cmap.serialize(include_class=False)["limits"] == [0.0, 1.0]
     with pytest.raises(properties.ValidationError):
         cmap.gradient = np.array([[0, 0, -1]])
     with pytest.raises(properties.ValidationError):
         cmap.gradient = np.array([[0, 0, 256]])
+    gradient = omf.attribute.Array(np.zeros((256, 3), dtype=np.uint8))
+    cmap.gradient = gradient
+    assert cmap.gradient.array is gradient.array
 
 
 def test_discrete_colormap():
@@ -233,6 +336,24 @@ def test_category_colormap():
         legend.validate()
 
 
+def test_category_colormap_lookup():
+    """Test looking up categories by index"""
+    legend = omf.attribute.CategoryColormap(indices=[5, 1, 3], values=["x", "y", "z"])
+    assert legend.lookup(1) == ("y", None)
+    assert legend.lookup(np.int64(5)) == ("x", None)
+    assert legend.lookup(2) is None
+    assert legend.has_category([0, 1, 2, 3, 5, 6]).tolist() == [False, True, False, True, True, False]
+    legend.colors = [[0, 0, 0], [0, 0, 255], [255, 0, 0]]
+    assert legend.lookup(3) == ("z", (255, 0, 0))
+    legend.indices = [0, 1, 2]
+    assert legend.lookup(3) is None
+    legend = omf.attribute.CategoryColormap(indices=[1, 2, 1], values=["x", "y", "z"])
+    assert legend.lookup(1) == ("x", None)
+    assert legend.has_category([0, 1, 2]).tolist() == [False, True, True]
+    legend = omf.attribute.CategoryColormap(indices=[], values=[])
+    assert legend.has_category(np.arange(3)).tolist() == [False, False, False]
+
+
 def test_category_data():
     """Test mapped data validation"""
     mattr = omf.attribute.CategoryAttribute()
@@ -85,6 +85,22 @@ def test_metadata_property():
     assert new_metadata.serialize(include_class=False) == serialized_has_meta
 
 
+@pytest.mark.parametrize("keys", [("meta_int", "meta_date"), ("meta_date", "meta_int")])
+def test_metadata_first_invalid_key(keys):
+    """Test the first invalid metadata key in dictionary order is reported"""
+
+    class WithMetadata(properties.HasProperties):
+        """Test class with metadata"""
+
+        metadata = omf.base.ArbitraryMetadataDict("Some metadata", Metadata, default=dict)
+
+    has_metadata = WithMetadata()
+    for key in keys:
+        has_metadata.metadata[key] = "not valid"
+    with pytest.raises(properties.ValidationError, match=keys[0]):
+        has_metadata.validate()
+
+
 class MyModelWithInt(omf.base.BaseModel):
     """Test class with one integer property"""
 
@@ -100,6 +116,14 @@ class MyModelWithIntAndInstance(omf.base.BaseModel):
     my_model = properties.Instance("", omf.base.BaseModel)
 
 
+def test_is_json_native():
+    """Test the metadata JSON shortcut only accepts JSON-native values"""
+    assert omf.base._is_json_native({"a": [1, 2.5, None, True, "x"], "b": {"c": (1, 2)}})  # pylint: disable=W0212
+    assert not omf.base._is_json_native({"a": np.int64(1)})  # pylint: disable=W0212
+    assert not omf.base._is_json_native({1: "a"})  # pylint: disable=W0212
+    assert not omf.base._is_json_native({"a": [Metadata]})  # pylint: disable=W0212
+
+
 @pytest.mark.parametrize("include_class", [True, False])
 def test_uid_model_serialize(include_class):
     """Test BaseModel correctly serializes to flat dictionary"""
@@ -177,3 +201,12 @@ def test_project_element():
         element.validate()
     element.location_length = lambda _: 3
     assert element.validate()
+    element.attributes = [MockAttribute(location="vertices"), MockAttribute(location="vertices")]
+    element.attributes[1].array = MockArray()
+    element.attributes[1].array.array = np.array([1, 2])
+    with pytest.raises(properties.ValidationError, match=r"attributes\[1\] length 2"):
+        element.validate()
+    element.location_length = lambda _: None
+    element.attributes = [MockAttribute(location="vertices")]
+    with pytest.raises(properties.ValidationError, match="vertices length None"):
+        element.validate()
@@ -0,0 +1,86 @@
+"""Tests for saving and loading OMF files"""
+import zipfile
+
+import numpy as np
+
+import omf
+
+
+def _make_project():
+    return omf.Project(
+        elements=[
+            omf.PointSet(
+                name="points",
+                vertices=np.random.rand(10, 3),
+                attributes=[
+                    omf.NumericAttribute(name="values", location="vertices", array=np.arange(10.0)),
+                    omf.NumericAttribute(name="flags", location="vertices", array=np.arange(10) % 3 == 0),
+                    omf.StringAttribute(name="labels", location="vertices", array=list("abcdefghij")),
+                ],
+            )
+        ]
+    )
+
+
+def _store_uncompressed(filename, stored_filename):
+    with zipfile.ZipFile(filename) as src, zipfile.ZipFile(stored_filename, mode="w") as dst:
+        for info in src.infolist():
+            dst.writestr(info.filename, src.read(info), compress_type=zipfile.ZIP_STORED)
+
+
+def _check_project(proj, new_proj):
+    assert new_proj.validate()
+    for attr, new_attr in zip(proj.elements[0].attributes, new_proj.elements[0].attributes):
+        assert list(attr.array) == list(new_attr.array)
+    assert np.array_equal(proj.elements[0].vertices.array, new_proj.elements[0].vertices.array)
+
+
+def test_save_load(tmp_path):
+    """Test a project survives a round trip through a file"""
+    proj = _make_project()
+    filename = omf.save(proj, str(tmp_path / "test.omf"))
+    omf.base.BaseModel._INSTANCES = {}  # pylint: disable=W0212
+    _check_project(proj, omf.load(filename))
+
+
+def test_load_stored(tmp_path):
+    """Test uncompressed binary data is memory-mapped on load"""
+    proj = _make_project()
+    filename = omf.save(proj, str(tmp_path / "deflated.omf"))
+    stored_filename = str(tmp_path / "stored.omf")
+    _store_uncompressed(filename, stored_filename)
+    omf.base.BaseModel._INSTANCES = {}  # pylint: disable=W0212
+    new_proj = omf.load(stored_filename, memory_map=True)
+    _check_project(proj, new_proj)
+    base = new_proj.elements[0].vertices.array
+    assert not base.flags.writeable
+    while isinstance(base, np.ndarray):
+        base = base.base
+    assert isinstance(base, memoryview)
+
+
+def test_save_chunked(tmp_path, monkeypatch):
+    """Test binaries larger than the write chunk size are saved correctly"""
+    monkeypatch.setattr(omf.fileio, "_WRITE_CHUNK_SIZE", 7)
+    proj = _make_project()
+    filename = omf.save(proj, str(tmp_path / "test.omf"))
+    omf.base.BaseModel._INSTANCES = {}  # pylint: disable=W0212
+    _check_project(proj, omf.load(filename))
+
+
+def test_load_stored_save_same_path(tmp_path):
+    """Test a loaded uncompressed file can be overwritten by saving to the same path"""
+    proj = _make_project()
+    filename = omf.save(proj, str(tmp_path / "deflated.omf"))
+    stored_filename = str(tmp_path / "stored.omf")
+    _store_uncompressed(filename, stored_filename)
+    omf.base.BaseModel._INSTANCES = {}  # pylint: disable=W0212
+    new_proj = omf.load(stored_filename)
+    base = new_proj.elements[0].vertices.array
+    while isinstance(base, np.ndarray):
+        base = base.base
+    assert not isinstance(base, memoryview)
+    omf.save(new_proj, stored_filename, mode="w")
+    _check_project(proj, new_proj)
+    omf.base.BaseModel._INSTANCES = {}  # pylint: disable=W0212
+    _check_project(proj, omf.load(stored_filename))
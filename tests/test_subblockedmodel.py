@@ -3,8 +3,10 @@ import numpy as np
 import properties
 import pytest
 
+from omf.attribute import Array
 from omf.blockmodel import BlockModel, RegularGrid, RegularSubblocks
-from omf.blockmodel.subblock_check import _group_by  # pylint: disable=W0212
+from omf.blockmodel.subblocks import _shrink_uint  # pylint: disable=W0212
+from omf.blockmodel.subblock_check import _all_sizes_valid, _Checker, _group_by  # pylint: disable=W0212
 
 
 def test_group_by():
@@ -37,6 +39,31 @@ def test_overlap():
         _test_regular((0, 0, 0, 2, 2, 1), (0, 0, 0, 4, 4, 2))
 
 
+def test_overlap_many():
+    """Test that overlaps are found in parent blocks with many sub-blocks."""
+    corners = [(i, j, 0, i + 1, j + 1, 3) for i in range(5) for j in range(4)]
+    _test_regular(*corners)
+    with pytest.raises(properties.ValidationError, match="overlapping sub-blocks"):
+        _test_regular(*corners, (4, 3, 2, 5, 4, 3))
+
+
+def test_overlap_fine_grid(monkeypatch):
+    """Test that overlaps in parent blocks with fine sub-block grids are found without einsum."""
+
+    def einsum(*args, **kwargs):
+        raise AssertionError("einsum should not be used")
+
+    monkeypatch.setattr(np, "einsum", einsum)
+    block_model = BlockModel(grid=_bm_grid(), subblocks=RegularSubblocks(subblock_count=(64, 64, 64)))
+    block_model.subblocks.parent_indices = np.zeros((8, 3), dtype=int)
+    corners = [(i * 8, 0, 0, i * 8 + 8, 64, 64) for i in range(8)]
+    block_model.subblocks.corners = np.array(corners)
+    assert block_model.validate()
+    block_model.subblocks.corners = np.array(corners[:-1] + [(50, 0, 0, 64, 64, 64)])
+    with pytest.raises(properties.ValidationError, match="overlapping sub-blocks"):
+        block_model.validate()
+
+
 def test_outside_parent():
     """Test that sub-blocks outside the parent block are rejected."""
     with pytest.raises(properties.ValidationError, match="0 <= min_corner"):
@@ -102,6 +129,48 @@ def test_bad_position():
         _test_octree((0, 1, 0, 2, 3, 1))
 
 
+def test_octree_counts():
+    """Test that octree sub-block counts must be powers of two."""
+    subblocks = RegularSubblocks(
+        subblock_count=(8, 1, 2),
+        mode="octree",
+        parent_indices=np.zeros((1, 3), dtype=int),
+        corners=np.array([(0, 0, 0, 1, 1, 1)]),
+    )
+    assert subblocks.validate()
+    subblocks.subblock_count = (8, 3, 2)
+    with pytest.raises(properties.ValidationError, match="powers of two"):
+        subblocks.validate()
+    with pytest.raises(properties.ValidationError, match="must be >= 1"):
+        subblocks.subblock_count = (8, 0, 2)
+
+
+def _test_full(*corners):
+    block_model = BlockModel(
+        grid=_bm_grid(),
+        subblocks=RegularSubblocks(subblock_count=(4, 4, 2), mode="full"),
+    )
+    block_model.subblocks.corners = np.array(corners)
+    block_model.subblocks.parent_indices = np.zeros((len(corners), 3), dtype=int)
+    block_model.validate()
+
+
+def test_full():
+    """Test full mode sub-block sizes."""
+    _test_full((0, 0, 0, 4, 4, 2))
+    _test_full((0, 0, 0, 1, 1, 1), (3, 3, 1, 4, 4, 2))
+    with pytest.raises(properties.ValidationError, match="does not match 'full' mode"):
+        _test_full((0, 0, 0, 2, 2, 1))
+
+
+def test_sizes_valid_large_count():
+    """Test the size check falls back to np.isin for large sub-block counts."""
+    count = np.array((1024, 1024, 1024))
+    valid = [count, (1, 1, 1)]
+    assert _all_sizes_valid(np.array([(1, 1, 1), (1024, 1024, 1024)]), valid, count)
+    assert not _all_sizes_valid(np.array([(1, 1, 1), (1024, 1, 1024)]), valid, count)
+
+
 def test_pack_subblock_arrays():
     """Test that packing of uint arrays during validation works."""
     block_model = BlockModel()
@@ -116,6 +185,85 @@ def test_pack_subblock_arrays():
     assert block_model.subblocks.corners.array.dtype == np.uint8
 
 
+@pytest.mark.parametrize(
+    ("largest", "dtype"),
+    [(255, np.uint8), (256, np.uint16), (2**16, np.uint32), (2**32, np.uint64)],
+)
+def test_shrink_uint(largest, dtype):
+    """Test integer arrays are shrunk to the smallest unsigned type that fits."""
+    arr = Array(np.array([0, largest], dtype=np.int64))
+    _shrink_uint(arr)
+    assert arr.array.dtype == dtype
+    assert arr.array[1] == largest
+
+
+def _read_only(arr):
+    """Return an Array deserialized from an immutable binary"""
+    binary_dict = {}
+    output = Array(np.array(arr, dtype=np.uint8)).serialize(binary_dict=binary_dict)
+    binary_dict = {key: bytes(value) for key, value in binary_dict.items()}
+    return Array.deserialize(output, binary_dict=binary_dict)
+
+
+def test_validation_skipped_when_unchanged(monkeypatch):
+    """Test sub-block checks only run again if read-only arrays or the grid change."""
+    block_model = BlockModel(grid=_bm_grid(), subblocks=RegularSubblocks(subblock_count=(5, 4, 3)))
+    block_model.subblocks.parent_indices = _read_only([(0, 0, 0)])
+    block_model.subblocks.corners = _read_only([(0, 0, 0, 5, 4, 3)])
+    block_model.validate()
+    # A read-only view of a writeable array can still change, so it is checked every time
+    corners = np.array([(0, 0, 0, 5, 4, 3)], dtype=np.uint8)
+    view = corners.view()
+    view.flags.writeable = False
+    block_model.subblocks.corners = Array._from_view(view)  # pylint: disable=W0212
+    block_model.validate()
+    corners[0] = (1, 1, 1, 1, 1, 1)
+    with pytest.raises(properties.ValidationError):
+        block_model.validate()
+    block_model.subblocks.corners = _read_only([(0, 0, 0, 5, 4, 3)])
+    block_model.validate()
+    calls = []
+    built = []
+
+    def check(checker):
+        calls.append(checker)
+
+    def post_init(checker):
+        built.append(checker)
+
+    monkeypatch.setattr(_Checker, "check", check)
+    monkeypatch.setattr(_Checker, "__post_init__", post_init)
+    block_model.validate()
+    assert not calls
+    assert not built
+    block_model.subblocks.mode = "full"
+    block_model.validate()
+    assert len(calls) == 1
+    block_model.subblocks.corners = _read_only([(0, 0, 0, 5, 4, 3)])
+    block_model.validate()
+    assert len(calls) == 2
+    block_model.subblocks.corners = np.array([(0, 0, 0, 5, 4, 3)], dtype=np.uint8)
+    block_model.validate()
+    block_model.validate()
+    assert len(calls) == 4
+
+
+def test_per_parent_counts():
+    """Test sub-block counts and covered volume per parent block."""
+    subblocks = RegularSubblocks(
+        subblock_count=(2, 2, 2),
+        parent_indices=np.array([(0, 0, 0), (0, 0, 0), (1, 1, 0)]),
+        corners=np.array([(0, 0, 0, 2, 2, 1), (0, 0, 1, 1, 1, 2), (0, 0, 0, 2, 2, 2)], dtype=np.uint8),
+    )
+    counts, covered = subblocks.per_parent_counts((2, 2, 1))
+    assert counts.tolist() == [2, 0, 0, 1]
+    assert covered.tolist() == [5, 0, 0, 8]
+    subblocks.parent_indices = np.zeros((0, 3), dtype=int)
+    subblocks.corners = np.zeros((0, 6), dtype=int)
+    counts, covered = subblocks.per_parent_counts((2, 2, 1))
+    assert counts.tolist() == covered.tolist() == [0, 0, 0, 0]
+
+
 def test_uninstantiated():
     """Test that grid is default and attributes are None on instantiation"""
     block_model = BlockModel(subblocks=RegularSubblocks())